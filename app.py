@@ -1,8 +1,19 @@
 import faicons as fa
+import numpy as np
 import plotly.express as px
 
 # Load data and compute static values
-from shared import app_dir, ngs_details
+from shared import (
+    app_dir,
+    currency_names,
+    currency_rates,
+    line_items,
+    ngs_details,
+    region_names,
+    region_rates,
+    regions,
+    storage_classes,
+)
 from shiny import reactive, render
 from shiny.express import input, ui
 from shinywidgets import render_plotly
@@ -17,11 +28,13 @@ ICONS = {
     "dna": fa.icon_svg("dna"),
     "add": fa.icon_svg("circle-plus"),
     "transfer": fa.icon_svg("right-left"),
+    "region": fa.icon_svg("earth-asia"),
 }
 
 # Default values
 mode = "Simple"
 currency = "USD"
+region = "ap-southeast-1"
 storage_class = "Standard Storage"
 total_months = 1
 a_duration = [6, 12]
@@ -29,18 +42,10 @@ a_duration = [6, 12]
 kb_in_gb = 1048576
 gb_in_tb = 1024
 
-# AWS pricing information
+# AWS pricing information is loaded from data/s3-region-pricing.csv
 # https://aws.amazon.com/s3/pricing/
 # always consider the highest tier, ideally cost reduces as storage increases
 # pricing is in USD
-standard_storage_cost_gb = 0.025
-data_transfer_out_cost = 0.09
-put_post_copy_list_request_cost = 0.000005
-get_select_1000_request_cost = 0.0004
-get_select_request_cost = 0.0000004
-deep_archive_storage_cost_gb = 0.002
-deep_archive_retrieval_cost_gb = 0.02
-deep_archive_request_cost = 0.0000025
 
 css_file = app_dir / "static" / "css" / "styles.css"
 
@@ -57,7 +62,7 @@ ui.page_opts(
 
 with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<span>")):
     ui.HTML(
-        "<em><span>Calculations made based on the pricing information retrieved from AWS (Singapore) as of June 05, 2024.</span></em>"
+        "<em><span>Calculations made based on the pricing information retrieved from AWS (Singapore) as of June 05, 2024. Prices for other regions are approximate and not yet verified against AWS.</span></em>"
     )
     with ui.layout_sidebar():
         with ui.sidebar(open="desktop", width=500, fill=True):
@@ -187,13 +192,16 @@ with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<spa
         ui.include_css(css_file)
 
         with ui.layout_columns(fill=False):
+            ui.input_select(
+                "region",
+                "Region:",
+                choices=region_names,
+                selected=region,
+            )
             ui.input_select(
                 "currency",
                 "Currency:",
-                choices={
-                    "USD": "US Dollar",
-                    "SGD": "Singapore Dollar",
-                },
+                choices=currency_names,
                 selected=currency,
             )
 
@@ -203,9 +211,9 @@ with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<spa
 
                 @render.express
                 def total_amount():
-                    amount = calculate_info()["total_cost"]
-                    if input.currency() == "SGD":
-                        amount = amount * 1.35
+                    amount = convert_currency(
+                        calculate_info()["total_cost"][region_index()]
+                    )
                     f"{amount:.2f} {input.currency()}"
 
             with ui.value_box(showcase=ICONS["file"]):
@@ -213,9 +221,9 @@ with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<spa
 
                 @render.express
                 def total_storage():
-                    amount = calculate_info()["storage_cost"]
-                    if input.currency() == "SGD":
-                        amount = amount * 1.35
+                    amount = convert_currency(
+                        calculate_info()["storage_cost"][region_index()]
+                    )
                     f"{amount:.2f} {input.currency()}"
 
             with ui.value_box(showcase=ICONS["transfer"]):
@@ -223,11 +231,24 @@ with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<spa
 
                 @render.express
                 def total_download():
-                    amount = calculate_info()["download_cost"]
-                    if input.currency() == "SGD":
-                        amount = amount * 1.35
+                    amount = convert_currency(
+                        calculate_info()["download_cost"][region_index()]
+                    )
                     f"{amount:.2f} {input.currency()}"
 
+            with ui.value_box(showcase=ICONS["region"]):
+                ui.HTML("<strong>Cheapest Region</strong>")
+
+                @render.express
+                def cheapest_region():
+                    costs = convert_currency(calculate_info()["total_cost"])
+                    cheapest = cheapest_regions(costs)
+                    if cheapest:
+                        ", ".join(region_names[i] for i in cheapest)
+                        f"{costs.min():.2f} {input.currency()}"
+                    else:
+                        "—"
+
         ui.input_action_button("show", "Show Cost Breakdown")
 
         with ui.layout_columns(
@@ -239,24 +260,33 @@ with ui.nav_panel(ui.HTML("<span style='font-size: 20px;'> S3 Cost Estimator<spa
             @render_plotly
             def pie_chart():
                 return pie_chart(
-                    calculate_info()["storage_cost"], calculate_info()["download_cost"]
+                    convert_currency(calculate_info()["storage_cost"][region_index()]),
+                    convert_currency(calculate_info()["download_cost"][region_index()]),
+                    input.currency(),
                 )
 
             @render_plotly
             def bar_chart_distribution():
-                storage_cost_distribution = calculate_info()[
-                    "storage_cost_distribution"
-                ]
-                return bar_chart_distribution(storage_cost_distribution)
+                storage_cost_distribution = region_cost_distribution()
+                return bar_chart_distribution(
+                    storage_cost_distribution, input.currency()
+                )
 
         with ui.layout_columns(col_widths={12}, fill=False, height="300px"):
 
             @render_plotly
             def bar_chart_accumulation():
-                storage_cost_distribution = calculate_info()[
-                    "storage_cost_distribution"
-                ]
-                return bar_chart_accumulation(storage_cost_distribution)
+                storage_cost_distribution = region_cost_distribution()
+                return bar_chart_accumulation(
+                    storage_cost_distribution, input.currency()
+                )
+
+        with ui.layout_columns(col_widths={12}, fill=False, height="300px"):
+
+            @render_plotly
+            def bar_chart_regions():
+                costs = convert_currency(calculate_info()["total_cost"])
+                return bar_chart_regions(costs, input.currency())
 
 
 with ui.nav_panel(
@@ -271,6 +301,60 @@ ui.nav_spacer()
 # --------------------------------------------------------
 @reactive.calc
 def calculate_info():
+    # rates for every region are stacked, so the costs are arrays indexed by region
+    info = calculate_cost(None)
+    for key in ["total_cost", "storage_cost", "download_cost"]:
+        info[key] = np.broadcast_to(info[key], len(regions))
+    for month in info["storage_cost_distribution"]:
+        month["Cost"] = np.broadcast_to(month["Cost"], len(regions))
+    return info
+
+
+@reactive.calc
+def calculate_breakdown():
+    # scalar rates for the selected region only, so the breakdown reads as plain prices
+    cost_breakdown = []
+    calculate_cost(input.region() if input.region() else region, cost_breakdown)
+    return cost_breakdown
+
+
+@reactive.calc
+def region_index():
+    return regions.get_loc(input.region() if input.region() else region)
+
+
+def region_cost_distribution():
+    i = region_index()
+    return [
+        {"Month": month["Month"], "Cost": convert_currency(month["Cost"][i])}
+        for month in calculate_info()["storage_cost_distribution"]
+    ]
+
+
+def convert_currency(amount):
+    return amount * currency_rates[input.currency() if input.currency() else currency]
+
+
+def get_rates(storage, region_code=None):
+    rates = region_rates[:, storage_classes.get_loc(storage)]
+    if region_code is not None:
+        rates = rates[regions.get_loc(region_code)]
+    return dict(zip(line_items, np.moveaxis(rates, -1, 0)))
+
+
+def cheapest_regions(costs):
+    # compare at the displayed precision so regions showing the same cost tie
+    costs = np.round(costs, 2)
+    if not costs.any():
+        return []
+    return list(regions[costs == costs.min()])
+
+
+def round_cost(cost):
+    return np.maximum(np.round(cost, 2), 0)
+
+
+def calculate_cost(region_code, cost_breakdown=None):
     mode = input.mode() if input.mode() else "Simple"
 
     if mode == "Simple":
@@ -283,12 +367,14 @@ def calculate_info():
         months = input.s_duration() if input.s_duration() else 0
         return calculate_simple(
             storage,
+            get_rates(storage, region_code),
             storage_size,
             sample_count,
             download_size,
             download_times,
             download_count,
             months,
+            cost_breakdown=cost_breakdown,
         )
     else:
         storage = "Standard Storage"
@@ -299,28 +385,30 @@ def calculate_info():
         )
         return calculate_advanced(
             storage,
+            get_rates(storage, region_code),
             sample_monthly_count,
             sample_avg_size,
             incoming_months,
             storage_months,
+            cost_breakdown=cost_breakdown,
         )
 
 
 def calculate_simple(
     storage,
+    rates,
     storage_size,
     sample_count,
     download_size,
     download_times,
     download_count,
     months,
+    cost_breakdown=None,
 ):
-    # create a variable to store array of cost breakdown logs so that we can display it in the UI
-    cost_breakdown = []
-
     # calculate the storage cost
     storage_cost = calculate_storage_cost(
         storage,
+        rates,
         storage_size * gb_in_tb,
         months,
         n_samples=sample_count,
@@ -340,6 +428,7 @@ def calculate_simple(
 
     download_cost = calculate_data_transfer_cost(
         storage,
+        rates,
         download_size * gb_in_tb,
         download_count,
         download_times,
@@ -347,22 +436,27 @@ def calculate_simple(
         cost_breakdown=cost_breakdown,
     )
     total_cost = storage_cost + download_cost
-    cost_breakdown.append(
-        f"Total Cost: ${storage_cost} + ${download_cost} = ${total_cost}"
-    )
+    if cost_breakdown is not None:
+        cost_breakdown.append(
+            f"Total Cost: ${storage_cost} + ${download_cost} = ${total_cost}"
+        )
     return {
         "total_cost": total_cost,
         "storage_cost": storage_cost,
         "download_cost": download_cost,
-        "cost_breakdown": cost_breakdown,
         "storage_cost_distribution": storage_cost_distribution,
     }
 
 
 def calculate_advanced(
-    storage, sample_monthly_count, sample_avg_size, incoming_months, storage_months
+    storage,
+    rates,
+    sample_monthly_count,
+    sample_avg_size,
+    incoming_months,
+    storage_months,
+    cost_breakdown=None,
 ):
-    cost_breakdown = []
     storage_cost_distribution = [
         {
             "Month": i,
@@ -377,6 +471,7 @@ def calculate_advanced(
         multiplier += sample_monthly_count
         storage_cost = calculate_storage_cost(
             storage,
+            rates,
             sample_avg_size * multiplier,
             1,
             n_samples=sample_monthly_count,
@@ -391,6 +486,7 @@ def calculate_advanced(
     for i in range(incoming_months, storage_months):
         storage_cost = calculate_storage_cost(
             storage,
+            rates,
             total_storage,
             1,
             n_samples=sample_monthly_count,
@@ -402,38 +498,29 @@ def calculate_advanced(
     # calculate the total storage cost
     storage_cost = sum([i["Cost"] for i in storage_cost_distribution])
     total_cost = storage_cost
-    cost_breakdown.append(f"Total Cost: ${storage_cost} = ${total_cost}")
+    if cost_breakdown is not None:
+        cost_breakdown.append(f"Total Cost: ${storage_cost} = ${total_cost}")
     return {
         "total_cost": total_cost,
         "storage_cost": storage_cost,
         "download_cost": 0,
-        "cost_breakdown": cost_breakdown,
         "storage_cost_distribution": storage_cost_distribution,
     }
 
 
 def calculate_storage_cost(
-    storage, gb, months, n_samples, requests_per_obj=1, cost_breakdown=[]
+    storage, rates, gb, months, n_samples, requests_per_obj=1, cost_breakdown=None
 ):
-    storage_cost_gb = 0.002
+    storage_cost_gb = rates["storage_gb_month"]
     storage_overhead_kb = 8
 
-    # Metadata overhead
+    # Metadata overhead at the storage class rate; zeroed for Standard Storage below
     metadata_overhead_kb = 32
-    metadata_overhead_cost_per_gb = 0.002
-
-    cost_breakdown.append("Storage Cost Breakdown:")
+    metadata_overhead_cost_per_gb = storage_cost_gb
 
     if storage == "Standard Storage":
-        storage_cost_gb = standard_storage_cost_gb
-        cost_breakdown.append(f"Standard Storage Cost: ${storage_cost_gb} per GB/Month")
         storage_overhead_kb = 0
         metadata_overhead_kb = 0
-    else:
-        storage_cost_gb = deep_archive_storage_cost_gb
-        cost_breakdown.append(
-            f"Deep Archive Storage Cost: ${storage_cost_gb} per GB/Month"
-        )
 
     overhead_total_gb = (metadata_overhead_kb / kb_in_gb) * n_samples
     metadata_cost_overhead = metadata_overhead_cost_per_gb * overhead_total_gb
@@ -443,16 +530,10 @@ def calculate_storage_cost(
         storage_overhead_kb / kb_in_gb
     ) * n_samples  # this is tiered
 
-    put_post_copy_list_1000_request_cost = put_post_copy_list_request_cost * 1000
-    cost_breakdown.append(
-        f"Requests Cost (PUT, POST): ${put_post_copy_list_1000_request_cost} per 1000 requests"
-    )
+    put_post_copy_list_request_cost = rates["put_request"]
 
     monthly_cost = storage_cost_gb * gb
-    storage_cost = round(monthly_cost * months, 2)
-    cost_breakdown.append(
-        f"Total Storage Cost: ${storage_cost_gb} x {gb} GB x {months} Month(s)= ${storage_cost}"
-    )
+    storage_cost = np.round(monthly_cost * months, 2)
 
     # Cost per request
     requests_cost = requests_per_obj * n_samples * put_post_copy_list_request_cost
@@ -461,85 +542,114 @@ def calculate_storage_cost(
         metadata_cost_overhead + storage_cost_overhead + requests_cost + storage_cost
     )
 
-    return round(total_cost, 2) if total_cost and total_cost > 0 else 0
+    if cost_breakdown is not None:
+        put_post_copy_list_1000_request_cost = put_post_copy_list_request_cost * 1000
+        cost_breakdown.append("Storage Cost Breakdown:")
+        if storage == "Standard Storage":
+            cost_breakdown.append(
+                f"Standard Storage Cost: ${storage_cost_gb} per GB/Month"
+            )
+        else:
+            cost_breakdown.append(
+                f"Deep Archive Storage Cost: ${storage_cost_gb} per GB/Month"
+            )
+        cost_breakdown.append(
+            f"Requests Cost (PUT, POST): ${put_post_copy_list_1000_request_cost} per 1000 requests"
+        )
+        cost_breakdown.append(
+            f"Total Storage Cost: ${storage_cost_gb} x {gb} GB x {months} Month(s)= ${storage_cost}"
+        )
+
+    return round_cost(total_cost)
 
 
 def calculate_data_retrival_cost(
-    gb, n_samples, times, requests_per_obj=2, cost_breakdown=[]
+    rates, gb, n_samples, times, requests_per_obj=2, cost_breakdown=None
 ):
-    cost_breakdown.append("Data Retrieval Cost Breakdown:")
-    cost_breakdown.append(
-        f"Data Retrieval Cost: ${deep_archive_retrieval_cost_gb} per GB/Month"
-    )
-    cost_breakdown.append(
-        f"GET and all other Requests Cost: ${deep_archive_request_cost} per 1000 requests"
-    )
+    deep_archive_retrieval_cost_gb = rates["retrieval_gb"]
+    deep_archive_request_cost = rates["retrieval_request"]
     # Data Retrieval Cost = Data Retrieved (GB) x $0.0200 per GB + $0.0025 per 1,000 requests
     gb_cost = gb * deep_archive_retrieval_cost_gb
-    cost_breakdown.append(
-        f"Data Retrieval Cost: {gb} GB x ${deep_archive_retrieval_cost_gb} = ${gb_cost}"
-    )
-    requests_cost = round(n_samples * deep_archive_request_cost, 2)
-    cost_breakdown.append(
-        f"Requests Cost (GET, SELECT): {n_samples} files x {deep_archive_request_cost} per request = ${requests_cost}"
-    )
+    requests_cost = np.round(n_samples * deep_archive_request_cost, 2)
     total_cost = gb_cost + requests_cost
-    cost_breakdown.append(
-        f"Total Data Retrieval Cost: ${gb_cost} + ${requests_cost} = ${total_cost}"
-    )
-    return round(total_cost, 2) if total_cost and total_cost > 0 else 0
+    if cost_breakdown is not None:
+        cost_breakdown.append("Data Retrieval Cost Breakdown:")
+        cost_breakdown.append(
+            f"Data Retrieval Cost: ${deep_archive_retrieval_cost_gb} per GB/Month"
+        )
+        cost_breakdown.append(
+            f"GET and all other Requests Cost: ${deep_archive_request_cost} per 1000 requests"
+        )
+        cost_breakdown.append(
+            f"Data Retrieval Cost: {gb} GB x ${deep_archive_retrieval_cost_gb} = ${gb_cost}"
+        )
+        cost_breakdown.append(
+            f"Requests Cost (GET, SELECT): {n_samples} files x {deep_archive_request_cost} per request = ${requests_cost}"
+        )
+        cost_breakdown.append(
+            f"Total Data Retrieval Cost: ${gb_cost} + ${requests_cost} = ${total_cost}"
+        )
+    return round_cost(total_cost)
 
 
 def calculate_data_transfer_cost(
-    storage, gb, n_samples, times, requests_per_obj=2, cost_breakdown=[]
+    storage, rates, gb, n_samples, times, requests_per_obj=2, cost_breakdown=None
 ):
+    data_transfer_out_cost = rates["transfer_out_gb"]
+    get_select_request_cost = rates["get_request"]
     retrival_cost = 0
     total_cost = 0
     if storage != "Standard Storage":
         retrival_cost = calculate_data_retrival_cost(
-            gb, n_samples, times, requests_per_obj, cost_breakdown=cost_breakdown
+            rates,
+            gb,
+            n_samples,
+            times,
+            requests_per_obj,
+            cost_breakdown=cost_breakdown,
         )
 
-    cost_breakdown.append("Data Transfer Cost Breakdown:")
-    cost_breakdown.append(
-        f"Data Transfer Out to Internet Cost: ${data_transfer_out_cost} per GB"
-    )
-    cost_breakdown.append(
-        f"GET and all other Requests Cost: ${get_select_1000_request_cost} per 1000 requests"
-    )
     # Data Transfer OUT to Internet: Cost = Data Transferred (GB) x $0.09 per GB
     # Data Transfer IN from Internet: No charge
     # GET and all other Requests: $0.0004 per 1,000 requests
     requests_cost = requests_per_obj * n_samples * get_select_request_cost
-    cost_breakdown.append(
-        f"Requests Cost (GET, SELECT): {n_samples} files x {get_select_request_cost} per request = ${requests_cost}"
-    )
-    transfer_cost = round(gb * data_transfer_out_cost, 2)
-    cost_breakdown.append(
-        f"Data Transfer Out Cost: {gb} GB x ${data_transfer_out_cost} = ${transfer_cost}"
-    )
+    transfer_cost = np.round(gb * data_transfer_out_cost, 2)
+    total_cost = (requests_cost + transfer_cost + retrival_cost) * times
 
-    if storage == "Standard Storage":
-        total_cost = (requests_cost + transfer_cost) * times
+    if cost_breakdown is not None:
+        get_select_1000_request_cost = np.round(get_select_request_cost * 1000, 6)
+        cost_breakdown.append("Data Transfer Cost Breakdown:")
         cost_breakdown.append(
-            f"Total Data Transfer Cost: (${requests_cost} + ${transfer_cost}) x {times} Time(s) = ${total_cost}"
+            f"Data Transfer Out to Internet Cost: ${data_transfer_out_cost} per GB"
         )
-    else:
-        total_cost = (requests_cost + transfer_cost + retrival_cost) * times
         cost_breakdown.append(
-            f"Total Data Transfer Cost: (${requests_cost} + ${transfer_cost} + ${retrival_cost}) x {times} Time(s) = ${total_cost}"
+            f"GET and all other Requests Cost: ${get_select_1000_request_cost} per 1000 requests"
         )
-    return round(total_cost, 2) if total_cost and total_cost > 0 else 0
+        cost_breakdown.append(
+            f"Requests Cost (GET, SELECT): {n_samples} files x {get_select_request_cost} per request = ${requests_cost}"
+        )
+        cost_breakdown.append(
+            f"Data Transfer Out Cost: {gb} GB x ${data_transfer_out_cost} = ${transfer_cost}"
+        )
+        if storage == "Standard Storage":
+            cost_breakdown.append(
+                f"Total Data Transfer Cost: (${requests_cost} + ${transfer_cost}) x {times} Time(s) = ${total_cost}"
+            )
+        else:
+            cost_breakdown.append(
+                f"Total Data Transfer Cost: (${requests_cost} + ${transfer_cost} + ${retrival_cost}) x {times} Time(s) = ${total_cost}"
+            )
+    return round_cost(total_cost)
 
 
-def pie_chart(storage_cost, download_cost):
+def pie_chart(storage_cost, download_cost, currency_code):
     fig = px.pie(
         values=[storage_cost, download_cost],
         names=["Storage Cost", "Download Cost"],
         title="Cost Distribution",
         labels={
-            "Storage Cost": "Storage Cost (USD)",
-            "Download Cost": "Download Cost (USD)",
+            "Storage Cost": f"Storage Cost ({currency_code})",
+            "Download Cost": f"Download Cost ({currency_code})",
         },
     )
     fig.update_traces(
@@ -551,7 +661,7 @@ def pie_chart(storage_cost, download_cost):
     return fig
 
 
-def bar_chart_distribution(data_array):
+def bar_chart_distribution(data_array, currency_code):
     data_array_copy = data_array.copy()
 
     fig = px.bar(
@@ -560,12 +670,12 @@ def bar_chart_distribution(data_array):
         y="Cost",
         title="Storage Cost Distribution by Month",
         hover_data=["Month", "Cost"],
-        labels={"Cost": "Storage Cost (USD)", "Month": "Months"},
+        labels={"Cost": f"Storage Cost ({currency_code})", "Month": "Months"},
     )
     return fig
 
 
-def bar_chart_accumulation(data_array):
+def bar_chart_accumulation(data_array, currency_code):
     # manually copy to another array
     data_array_copy = data_array.copy()
 
@@ -578,7 +688,20 @@ def bar_chart_accumulation(data_array):
         y="Cost",
         title="Accumulated Cost over Month",
         hover_data=["Month", "Cost"],
-        labels={"Cost": "Storage Cost (USD)", "Month": "Months"},
+        labels={"Cost": f"Storage Cost ({currency_code})", "Month": "Months"},
+    )
+    return fig
+
+
+def bar_chart_regions(costs, currency_code):
+    cheapest = cheapest_regions(costs)
+    fig = px.bar(
+        x=[region_names[i] for i in regions],
+        y=costs,
+        color=["Cheapest" if i in cheapest else "Other" for i in regions],
+        color_discrete_map={"Cheapest": "#00AA00", "Other": "#6070FA"},
+        title="Total Cost by Region",
+        labels={"x": "Region", "y": f"Total Cost ({currency_code})", "color": ""},
     )
     return fig
 
@@ -593,6 +716,7 @@ def _():
     ui.update_numeric("s_download_samples", value=0)
     ui.update_slider("s_duration", value=total_months)
     ui.update_checkbox_group("a_class", selected=storage_class)
+    ui.update_select("region", selected=region)
     ui.update_select("currency", selected=currency)
     ui.update_radio_buttons("mode", selected=mode)
 
@@ -624,7 +748,7 @@ def _():
 
 
 def backup_cost():
-    for i in calculate_info()["cost_breakdown"]:
+    for i in calculate_breakdown():
         if i.endswith(":"):
             ui.HTML(f"<p style='font-weight: bold;'><u>{i}</u></p>")
         else:
@@ -638,7 +762,7 @@ def print_cost():
             if i.endswith(":")
             else f"<p>{i}</p>"
         )
-        for i in calculate_info()["cost_breakdown"]
+        for i in calculate_breakdown()
     ]
     big_string = "".join(html_strings)
     return ui.HTML(big_string)
@@ -3,3 +3,24 @@ import pandas as pd
 
 app_dir = Path(__file__).parent
 ngs_details = pd.read_csv(app_dir / "data/ngs-size.csv")
+
+# S3 pricing (USD) as a region x storage class x line item matrix
+s3_pricing = pd.read_csv(app_dir / "data/s3-region-pricing.csv")
+regions = pd.Index(s3_pricing["region"].unique())
+storage_classes = pd.Index(s3_pricing["storage_class"].unique())
+line_items = pd.Index(s3_pricing["line_item"].unique())
+region_names = dict(zip(s3_pricing["region"], s3_pricing["region_name"]))
+region_prices = s3_pricing.set_index(["region", "storage_class", "line_item"])[
+    "price"
+].reindex(pd.MultiIndex.from_product([regions, storage_classes, line_items]))
+if region_prices.isna().any():
+    missing = ", ".join(str(i) for i in region_prices[region_prices.isna()].index)
+    raise ValueError(f"Missing prices in data/s3-region-pricing.csv for: {missing}")
+region_rates = region_prices.to_numpy().reshape(
+    len(regions), len(storage_classes), len(line_items)
+)
+
+# Currency conversion rates, as units of currency per 1 USD
+currency_table = pd.read_csv(app_dir / "data/currency-rates.csv", index_col="currency")
+currency_rates = currency_table["usd_rate"]
+currency_names = currency_table["currency_name"].to_dict()